@@ -7,7 +7,7 @@ from typing import Annotated
 import json
 import time
 from datetime import datetime
-from web_search_agent import search_market_info
+from web_search_agent import search_market_info, close_search_agent
 from visualization_agent import generate_chart
 
 # 注意：请确保安装了 autogen-agentchat 和 autogen-ext
@@ -986,29 +986,33 @@ async def main():
     print("   - 自动创建reports目录存储历史报告")
     print("=" * 50)
     
-    # 测试LLM连接
-    if not await test_llm():
-        print("❌ LLM连接失败，请检查配置")
-        return
+    try:
+        # 测试LLM连接
+        if not await test_llm():
+            print("❌ LLM连接失败，请检查配置")
+            return
     
-    system = FinancialAnalysisSystem()
+        system = FinancialAnalysisSystem()
 
-    while True:
-        try:
-            user_input = input("\n👤 请输入指令: ").strip()
-            if not user_input: 
-                continue
-            if user_input.lower() in ["exit", "quit", "退出"]: 
-                break
+        while True:
+            try:
+                user_input = input("\n👤 请输入指令: ").strip()
+                if not user_input: 
+                    continue
+                if user_input.lower() in ["exit", "quit", "退出"]: 
+                    break
 
-            await system.run_turn(user_input)
+                await system.run_turn(user_input)
             
-        except KeyboardInterrupt:
-            print("\n程序已停止")
-            break
-        except Exception as e:
-            print(f"\n❌ 发生错误: {e}")
-            import traceback
-            traceback.print_exc()
+            except KeyboardInterrupt:
+                print("\n程序已停止")
+                break
+            except Exception as e:
+                print(f"\n❌ 发生错误: {e}")
+                import traceback
+                traceback.print_exc()
+    finally:
+        # 关闭搜索代理的共享HTTP客户端
+        await close_search_agent()
 
 await main()
\ No newline at end of file
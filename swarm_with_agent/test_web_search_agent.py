@@ -0,0 +1,38 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from web_search_agent import BaiduSearchAgent, _HTML_PARSER
+
+
+def _cards(n):
+    return ''.join(
+        f'<div class="result"><h3><a href="http://example.com/{i}">Title number {i} here</a></h3>'
+        f'<div class="c-abstract">abstract {i} text</div></div>'
+        for i in range(n)
+    )
+
+
+class ParseBaiduResultsTest(unittest.TestCase):
+    """结果容器选择器优先级"""
+
+    def _titles(self, html):
+        soup = BeautifulSoup(html, _HTML_PARSER)
+        return [r["title"] for r in BaiduSearchAgent()._parse_baidu_results_optimized(soup)]
+
+    def test_result_cards_inside_result_wrapper(self):
+        html = f'<div class="results-wrap"><div class="content-left">{_cards(6)}</div></div>'
+        self.assertEqual(self._titles(html), [f"Title number {i} here" for i in range(6)])
+
+    def test_result_cards_win_over_wrapper_siblings(self):
+        html = (
+            '<div class="result-page">'
+            '<div class="related"><h3><a href="/related">Related searches header</a></h3></div>'
+            f'<div class="content-left">{_cards(6)}</div>'
+            '</div>'
+        )
+        self.assertEqual(self._titles(html), [f"Title number {i} here" for i in range(6)])
+
+
+if __name__ == '__main__':
+    unittest.main()
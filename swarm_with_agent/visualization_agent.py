@@ -1,25 +1,85 @@
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend, charts are only written to files
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
 import seaborn as sns
 import pandas as pd
 import numpy as np
 from io import BytesIO
 import base64
 import logging
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 import os
 from datetime import datetime
 import json
 import re
 import asyncio
+import hashlib
+import threading
+import itertools
+import multiprocessing
+from collections import OrderedDict, defaultdict
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import fpnge  # Optional faster PNG encoder
+except ImportError:
+    fpnge = None
+
+try:
+    import orjson  # Optional faster JSON serializer for cache keys
+except ImportError:
+    orjson = None
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 双语支持的正则表达式模式（模块加载时预编译）
+_FIN_FIELDS = [
+    (r'营业收入|Revenue', 'Revenue'),
+    (r'净利润|Net Profit', 'Net Profit'),
+    (r'毛利率|Gross Margin', 'Gross Margin'),
+    (r'ROE|净资产收益率', 'ROE'),
+    (r'资产负债率|Debt Ratio', 'Debt Ratio'),
+    (r'总资产|Total Assets', 'Total Assets'),
+    (r'总负债|Total Liabilities', 'Total Liabilities'),
+]
+# 合并为单个模式，一次扫描提取全部指标；值分组名 f{i}_v 对应 _FIN_FIELDS[i]
+_FIN_MASTER_RE = re.compile('|'.join(
+    rf'(?P<f{i}>{label})[：:\s]*(?P<f{i}_v>[\d\.]+)' for i, (label, _) in enumerate(_FIN_FIELDS)
+), re.IGNORECASE)
+_FIN_GROUP_KEYS = {f'f{i}_v': key for i, (_, key) in enumerate(_FIN_FIELDS)}
+# 数字+单位模式
+_NUMBER_RE = re.compile(r'([\d\.]+)\s*(?:亿元|亿|%|percent|million|billion)', re.IGNORECASE)
+_COMPANY_RE = re.compile(r'(公司|Company)[：:\s]*([^\s，]+)', re.IGNORECASE)
+_YEAR_RE = re.compile(r'(\d{4})年')
+_DIGIT_RE = re.compile(r'\d')
+
+# Chart file names: start time (once per run) + PID + per-process sequence number.
+# The PID is read per call because forked workers inherit the counter.
+_RUN_STAMP = datetime.now().strftime('%Y%m%d_%H%M%S')
+_chart_seq = itertools.count()
+
+# 解析失败时使用的模拟数据（只读）
+_MOCK_DATA = MappingProxyType({
+    'Revenue': 8900,
+    'Net Profit': 800,
+    'Gross Margin': 45,
+    'ROE': 15,
+    'Total Assets': 15000,
+    'Total Liabilities': 7000
+})
+
 class FinancialChartGenerator:
     """Financial Chart Generator"""
     
-    def __init__(self):
+    def __init__(self, dpi: int = 150):
+        self.dpi = dpi
         self.chart_styles = {
             'corporate': {'style': 'seaborn-v0_8-whitegrid', 'colors': ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D']},
             'modern': {'style': 'seaborn-v0_8-darkgrid', 'colors': ['#00A8E8', '#007EA7', '#003459', '#00171F']},
@@ -28,55 +88,169 @@ class FinancialChartGenerator:
         self.output_dir = "./charts"
         os.makedirs(self.output_dir, exist_ok=True)
         print(f"📁 Chart output directory: {self.output_dir}")
+        # Stylesheet rcParams are loaded once and applied per chart via rc_context
+        self._style_rc = {name: self._load_style_rc(cfg['style'])
+                          for name, cfg in self.chart_styles.items()}
+        # Content-keyed cache of generated chart results (LRU)
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._cache_maxsize = 128
+        self._cache_lock = threading.Lock()
+        # Reusable figures keyed by (figsize, style, nrows, ncols)
+        self._fig_pool: Dict[tuple, List] = defaultdict(list)
+        self._fig_pool_maxsize = 4
+        self._fig_pool_lock = threading.Lock()
     
-    def _save_chart(self, fig, filename: str) -> str:
-        """Save chart to file"""
-        filepath = os.path.join(self.output_dir, filename)
-        fig.savefig(filepath, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close(fig)
-        print(f"💾 Chart saved: {filepath}")
-        return filepath
+    def _load_style_rc(self, style_name: str) -> Dict:
+        """Load the rcParams a stylesheet (library name or file path) changes"""
+        with matplotlib.rc_context():
+            before = dict(matplotlib.rcParams)
+            try:
+                plt.style.use(style_name)
+            except OSError:
+                logger.warning(f"Chart style '{style_name}' not found, using matplotlib defaults")
+                return {}
+            after = dict(matplotlib.rcParams)
+        return {k: v for k, v in after.items() if before.get(k) != v}
+    
+    def _acquire_fig(self, figsize: Tuple[int, int], style: Optional[str] = None,
+                     nrows: int = 1, ncols: int = 1):
+        """Take a cleared figure from the pool or create a new one, return (fig, axes, pool_key)"""
+        pool_key = (figsize, style, nrows, ncols)
+        with self._fig_pool_lock:
+            pooled = self._fig_pool[pool_key].pop() if self._fig_pool[pool_key] else None
+        if pooled is not None:
+            fig, axes = pooled
+            return fig, axes, pool_key
+        
+        # Figures are created outside pyplot so they never register with its figure manager
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(nrows, ncols)
+        return fig, axes, pool_key
     
-    def _fig_to_base64(self, fig) -> str:
-        """Convert chart to base64 string"""
+    def _release_fig(self, fig, pool_key: tuple) -> None:
+        """Reset figure to its freshly created state and return it to the pool"""
+        _, _, nrows, ncols = pool_key
+        # ax.clear() keeps tick_params and tight_layout() keeps the previous subplot
+        # params, so rebuild the axes and restore default spacing instead
+        fig.clear()
+        fig.subplotpars.update(**{name: matplotlib.rcParams[f'figure.subplot.{name}']
+                                  for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+        axes = fig.subplots(nrows, ncols)
+        with self._fig_pool_lock:
+            if len(self._fig_pool[pool_key]) < self._fig_pool_maxsize:
+                self._fig_pool[pool_key].append((fig, axes))
+    
+    def _cache_key(self, chart_type: str, **payload) -> str:
+        """Build cache key from chart type and input content"""
+        # Charts draw data in insertion order, so hash dict items as an ordered list
+        payload = {name: list(value.items()) if isinstance(value, dict) else value
+                   for name, value in payload.items()}
+        payload['chart_type'] = chart_type
+        if orjson is not None:
+            raw = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+                               default=str)
+        else:
+            raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode()
+        return hashlib.sha1(raw).hexdigest()
+    
+    def _cache_get(self, key: str, return_base64: bool = False) -> Optional[Dict]:
+        """Return cached chart result if its file still exists"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                return None
+            if not os.path.exists(result["filepath"]):
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+        result = dict(result)
+        if not return_base64:
+            result["image_base64"] = None
+        elif result["image_base64"] is None:
+            # Cached without base64, encode from the saved file on demand
+            with open(result["filepath"], 'rb') as f:
+                result["image_base64"] = base64.b64encode(f.read()).decode()
+        print(f"♻️ Using cached chart: {result['filepath']}")
+        return result
+    
+    def _cache_put(self, key: str, result: Dict) -> None:
+        """Store chart result, evicting least recently used entries"""
+        with self._cache_lock:
+            self._cache[key] = dict(result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_maxsize:
+                self._cache.popitem(last=False)
+    
+    def _chart_filename(self, prefix: str) -> str:
+        """Build a unique chart file name"""
+        return f"{prefix}_{_RUN_STAMP}_{os.getpid()}_{next(_chart_seq)}.png"
+    
+    def _render_once(self, fig) -> bytes:
+        """Render chart to PNG bytes in a single encode pass"""
+        fig.set_dpi(self.dpi)
+        fig.patch.set_facecolor('white')
+        fig.tight_layout()
+        canvas = fig.canvas if isinstance(fig.canvas, FigureCanvasAgg) else FigureCanvasAgg(fig)
+        canvas.draw()
+        image = Image.fromarray(np.asarray(canvas.buffer_rgba()))
+        
+        if fpnge is not None:
+            return fpnge.fromPIL(image)
+        # Low zlib level: much faster, barely larger for flat-color charts
         buffer = BytesIO()
-        fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        image.save(buffer, 'PNG', compress_level=1, optimize=False)
+        png_bytes = buffer.getvalue()
         buffer.close()
-        return image_base64
+        return png_bytes
     
-    def generate_bar_chart(self, data: Dict, title: str, style: str = 'corporate') -> Dict:
+    def _save_chart(self, fig, pool_key: tuple, filename: str,
+                    return_base64: bool = False) -> Tuple[str, Optional[str]]:
+        """Save chart to file and release the figure, return (filepath, base64 string or None)"""
+        png_bytes = self._render_once(fig)
+        self._release_fig(fig, pool_key)
+        filepath = os.path.join(self.output_dir, filename)
+        with open(filepath, 'wb') as f:
+            f.write(png_bytes)
+        print(f"💾 Chart saved: {filepath}")
+        image_base64 = base64.b64encode(png_bytes).decode() if return_base64 else None
+        return filepath, image_base64
+    
+    def generate_bar_chart(self, data: Dict, title: str, style: str = 'corporate',
+                           return_base64: bool = False) -> Dict:
         """Generate bar chart"""
         try:
-            print(f"📊 Generating bar chart: {title}")
-            plt.style.use(self.chart_styles[style]['style'])
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            categories = list(data.keys())
-            values = list(data.values())
-            colors = self.chart_styles[style]['colors']
+            cache_key = self._cache_key('bar', title=title, style=style, data=data)
+            cached = self._cache_get(cache_key, return_base64)
+            if cached:
+                return cached
             
-            bars = ax.bar(categories, values, color=colors[:len(categories)], alpha=0.8)
-            
-            # Add value labels
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{height:.2f}', ha='center', va='bottom', fontsize=10)
-            
-            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-            ax.set_ylabel('Value', fontsize=12)
-            ax.grid(True, alpha=0.3)
-            
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            
-            filename = f"bar_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            filepath = self._save_chart(fig, filename)
-            image_base64 = self._fig_to_base64(fig)
-            
-            return {
+            print(f"📊 Generating bar chart: {title}")
+            with matplotlib.rc_context(self._style_rc[style]):
+                fig, ax, pool_key = self._acquire_fig((10, 6), style)
+                
+                categories = list(data.keys())
+                values = list(data.values())
+                colors = self.chart_styles[style]['colors']
+                
+                bars = ax.bar(categories, values, color=colors[:len(categories)], alpha=0.8)
+                
+                # Add value labels
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                           f'{height:.2f}', ha='center', va='bottom', fontsize=10)
+                
+                ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+                ax.set_ylabel('Value', fontsize=12)
+                ax.grid(True, alpha=0.3)
+                
+                plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+                
+                filename = self._chart_filename("bar_chart")
+                filepath, image_base64 = self._save_chart(fig, pool_key, filename, return_base64)
+            
+            result = {
                 "chart_type": "bar",
                 "title": title,
                 "filepath": filepath,
@@ -84,38 +258,44 @@ class FinancialChartGenerator:
                 "data_points": len(data),
                 "status": "success"
             }
+            self._cache_put(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Bar chart generation failed: {e}")
             return {"status": "error", "message": str(e)}
     
-    def generate_line_chart(self, data: Dict, title: str, xlabel: str = 'Quarter', style: str = 'corporate') -> Dict:
+    def generate_line_chart(self, data: Dict, title: str, xlabel: str = 'Quarter', style: str = 'corporate',
+                            return_base64: bool = False) -> Dict:
         """Generate line chart (time series)"""
         try:
-            print(f"📈 Generating line chart: {title}")
-            plt.style.use(self.chart_styles[style]['style'])
-            fig, ax = plt.subplots(figsize=(12, 6))
-            
-            times = list(data.keys())
-            values = list(data.values())
-            colors = self.chart_styles[style]['colors']
-            
-            ax.plot(times, values, marker='o', linewidth=2.5, color=colors[0], markersize=8)
-            ax.fill_between(times, values, alpha=0.2, color=colors[0])
-            
-            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-            ax.set_xlabel(xlabel, fontsize=12)
-            ax.set_ylabel('Value', fontsize=12)
-            ax.grid(True, alpha=0.3)
-            
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
+            cache_key = self._cache_key('line', title=title, xlabel=xlabel, style=style, data=data)
+            cached = self._cache_get(cache_key, return_base64)
+            if cached:
+                return cached
             
-            filename = f"line_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            filepath = self._save_chart(fig, filename)
-            image_base64 = self._fig_to_base64(fig)
-            
-            return {
+            print(f"📈 Generating line chart: {title}")
+            with matplotlib.rc_context(self._style_rc[style]):
+                fig, ax, pool_key = self._acquire_fig((12, 6), style)
+                
+                times = list(data.keys())
+                values = list(data.values())
+                colors = self.chart_styles[style]['colors']
+                
+                ax.plot(times, values, marker='o', linewidth=2.5, color=colors[0], markersize=8)
+                ax.fill_between(times, values, alpha=0.2, color=colors[0])
+                
+                ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+                ax.set_xlabel(xlabel, fontsize=12)
+                ax.set_ylabel('Value', fontsize=12)
+                ax.grid(True, alpha=0.3)
+                
+                plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+                
+                filename = self._chart_filename("line_chart")
+                filepath, image_base64 = self._save_chart(fig, pool_key, filename, return_base64)
+            
+            result = {
                 "chart_type": "line",
                 "title": title,
                 "filepath": filepath,
@@ -123,50 +303,55 @@ class FinancialChartGenerator:
                 "data_points": len(data),
                 "status": "success"
             }
+            self._cache_put(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Line chart generation failed: {e}")
             return {"status": "error", "message": str(e)}
     
-    def generate_pie_chart(self, data: Dict, title: str, style: str = 'corporate') -> Dict:
+    def generate_pie_chart(self, data: Dict, title: str, style: str = 'corporate',
+                           return_base64: bool = False) -> Dict:
         """Generate pie chart for percentage data"""
         try:
-            print(f"🥧 Generating pie chart: {title}")
-            plt.style.use(self.chart_styles[style]['style'])
-            fig, ax = plt.subplots(figsize=(8, 8))
-            
-            # Filter only percentage data
-            percentage_data = {}
-            for key, value in data.items():
-                if any(keyword in key.lower() for keyword in ['margin', 'ratio', 'roe', 'rate']):
-                    percentage_data[key] = value
-            
-            if not percentage_data:
-                # If no percentage data, use all data but convert to percentages
-                total = sum(data.values())
-                percentage_data = {k: (v/total)*100 for k, v in data.items()}
-            
-            labels = list(percentage_data.keys())
-            sizes = list(percentage_data.values())
-            colors = self.chart_styles[style]['colors']
-            
-            wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct='%1.1f%%',
-                                            colors=colors[:len(labels)], startangle=90)
-            
-            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-            
-            # Beautify percentage text
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-            
-            plt.tight_layout()
+            cache_key = self._cache_key('pie', title=title, style=style, data=data)
+            cached = self._cache_get(cache_key, return_base64)
+            if cached:
+                return cached
             
-            filename = f"pie_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            filepath = self._save_chart(fig, filename)
-            image_base64 = self._fig_to_base64(fig)
-            
-            return {
+            print(f"🥧 Generating pie chart: {title}")
+            with matplotlib.rc_context(self._style_rc[style]):
+                fig, ax, pool_key = self._acquire_fig((8, 8), style)
+                
+                # Filter only percentage data
+                percentage_data = {}
+                for key, value in data.items():
+                    if any(keyword in key.lower() for keyword in ['margin', 'ratio', 'roe', 'rate']):
+                        percentage_data[key] = value
+                
+                if not percentage_data:
+                    # If no percentage data, use all data but convert to percentages
+                    total = sum(data.values())
+                    percentage_data = {k: (v/total)*100 for k, v in data.items()}
+                
+                labels = list(percentage_data.keys())
+                sizes = list(percentage_data.values())
+                colors = self.chart_styles[style]['colors']
+                
+                wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct='%1.1f%%',
+                                                colors=colors[:len(labels)], startangle=90)
+                
+                ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+                
+                # Beautify percentage text
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontweight('bold')
+                
+                filename = self._chart_filename("pie_chart")
+                filepath, image_base64 = self._save_chart(fig, pool_key, filename, return_base64)
+            
+            result = {
                 "chart_type": "pie",
                 "title": title,
                 "filepath": filepath,
@@ -174,71 +359,62 @@ class FinancialChartGenerator:
                 "data_points": len(percentage_data),
                 "status": "success"
             }
+            self._cache_put(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Pie chart generation failed: {e}")
             return {"status": "error", "message": str(e)}
     
-    def generate_metrics_dashboard(self, metrics: Dict, company: str, year: str) -> Dict:
+    def generate_metrics_dashboard(self, metrics: Dict, company: str, year: str,
+                                   return_base64: bool = False) -> Dict:
         """Generate financial metrics dashboard with actual data"""
         try:
-            fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-            fig.suptitle(f'{company} {year} Financial Metrics Dashboard', fontsize=16, fontweight='bold')
-            
-            # 1. Profitability metrics
-            profit_metrics = {k: v for k, v in metrics.items() 
-                            if any(word in k.lower() for word in ['revenue', 'profit', 'margin'])}
-            if profit_metrics:
-                axes[0,0].bar(profit_metrics.keys(), profit_metrics.values(), color='#2E86AB')
-                axes[0,0].set_title('Profitability Metrics')
-                axes[0,0].tick_params(axis='x', rotation=45)
-                axes[0,0].grid(True, alpha=0.3)
-            
-            # 2. Growth metrics
-            growth_metrics = {k: v for k, v in metrics.items() 
-                            if any(word in k.lower() for word in ['growth', 'increase'])}
-            if not growth_metrics:
-                # If no growth metrics, use all metrics for comparison
-                growth_metrics = metrics
-            if growth_metrics:
-                axes[0,1].bar(growth_metrics.keys(), growth_metrics.values(), color='#A23B72')
-                axes[0,1].set_title('Key Metrics Comparison')
-                axes[0,1].tick_params(axis='x', rotation=45)
-                axes[0,1].grid(True, alpha=0.3)
-            
-            # 3. Financial structure metrics
-            structure_metrics = {k: v for k, v in metrics.items() 
-                               if any(word in k.lower() for word in ['debt', 'asset', 'equity'])}
-            if not structure_metrics:
-                # If no structure metrics, use the first 4 metrics
-                items = list(metrics.items())
-                structure_metrics = dict(items[:min(4, len(items))])
-            if structure_metrics:
-                axes[1,0].bar(structure_metrics.keys(), structure_metrics.values(), color='#F18F01')
-                axes[1,0].set_title('Financial Structure')
-                axes[1,0].tick_params(axis='x', rotation=45)
-                axes[1,0].grid(True, alpha=0.3)
+            cache_key = self._cache_key('dashboard', metrics=metrics, company=company, year=year)
+            cached = self._cache_get(cache_key, return_base64)
+            if cached:
+                return cached
             
-            # 4. Operational efficiency metrics
-            efficiency_metrics = {k: v for k, v in metrics.items() 
-                                if any(word in k.lower() for word in ['roe', 'roa', 'efficiency'])}
-            if not efficiency_metrics:
-                # If no efficiency metrics, use the last 4 metrics
-                items = list(metrics.items())
-                efficiency_metrics = dict(items[-min(4, len(items)):])
-            if efficiency_metrics:
-                axes[1,1].bar(efficiency_metrics.keys(), efficiency_metrics.values(), color='#C73E1D')
-                axes[1,1].set_title('Efficiency Metrics')
-                axes[1,1].tick_params(axis='x', rotation=45)
-                axes[1,1].grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            
-            filename = f"dashboard_{company}_{year}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            filepath = self._save_chart(fig, filename)
-            image_base64 = self._fig_to_base64(fig)
+            fig, axes, pool_key = self._acquire_fig((15, 10), nrows=2, ncols=2)
+            fig.suptitle(f'{company} {year} Financial Metrics Dashboard', fontsize=16, fontweight='bold')
             
-            return {
+            # Classify metric names once, then select each panel's bars with a mask
+            keys = np.array(list(metrics.keys()), dtype=str)
+            values = np.fromiter(metrics.values(), dtype=float, count=len(metrics))
+            lower_keys = np.char.lower(keys)
+            positions = np.arange(len(keys))
+            
+            def contains_any(words) -> np.ndarray:
+                return np.logical_or.reduce([np.char.find(lower_keys, word) >= 0 for word in words])
+            
+            panels = [
+                # 1. Profitability metrics
+                (axes[0,0], contains_any(['revenue', 'profit', 'margin']), None,
+                 'Profitability Metrics', '#2E86AB'),
+                # 2. Growth metrics (if none, use all metrics for comparison)
+                (axes[0,1], contains_any(['growth', 'increase']), positions >= 0,
+                 'Key Metrics Comparison', '#A23B72'),
+                # 3. Financial structure metrics (if none, use the first 4 metrics)
+                (axes[1,0], contains_any(['debt', 'asset', 'equity']), positions < 4,
+                 'Financial Structure', '#F18F01'),
+                # 4. Operational efficiency metrics (if none, use the last 4 metrics)
+                (axes[1,1], contains_any(['roe', 'roa', 'efficiency']), positions >= len(keys) - 4,
+                 'Efficiency Metrics', '#C73E1D'),
+            ]
+            
+            for ax, mask, fallback, panel_title, color in panels:
+                if not mask.any() and fallback is not None:
+                    mask = fallback
+                if mask.any():
+                    ax.bar(keys[mask], values[mask], color=color)
+                    ax.set_title(panel_title)
+                    ax.tick_params(axis='x', rotation=45)
+                    ax.grid(True, alpha=0.3)
+            
+            filename = self._chart_filename(f"dashboard_{company}_{year}")
+            filepath, image_base64 = self._save_chart(fig, pool_key, filename, return_base64)
+            
+            result = {
                 "chart_type": "dashboard",
                 "title": f"{company} {year} Financial Dashboard",
                 "filepath": filepath,
@@ -246,6 +422,8 @@ class FinancialChartGenerator:
                 "metrics_count": len(metrics),
                 "status": "success"
             }
+            self._cache_put(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Dashboard generation failed: {e}")
@@ -254,39 +432,81 @@ class FinancialChartGenerator:
 # Create global instance
 chart_generator = FinancialChartGenerator()
 
-async def _parse_financial_data(data_summary: str) -> Dict:
+# Chart kinds mapped to the FinancialChartGenerator method that draws them
+_CHART_METHODS = {
+    'bar': 'generate_bar_chart',
+    'line': 'generate_line_chart',
+    'pie': 'generate_pie_chart',
+    'dashboard': 'generate_metrics_dashboard',
+}
+
+# Chart rendering is CPU-bound, so generate_chart runs it in worker processes.
+# The parent process owns the result cache; workers only render.
+_PROC_POOL: Optional[ProcessPoolExecutor] = None
+
+def _init_chart_worker() -> None:
+    """Worker initializer: disable the worker's own result cache"""
+    chart_generator._cache_maxsize = 0
+
+def _render_chart_worker(kind: str, chart_kwargs: Dict) -> Dict:
+    """Draw one planned chart (runs in a worker process)"""
+    return getattr(chart_generator, _CHART_METHODS[kind])(**chart_kwargs)
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared chart worker pool, creating it on first use"""
+    global _PROC_POOL
+    if _PROC_POOL is None:
+        # spawn, not fork: the parent runs other threads, and a forked child can deadlock on an inherited lock
+        _PROC_POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_chart_worker,
+        )
+    return _PROC_POOL
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken worker pool so the next call builds a new one"""
+    global _PROC_POOL
+    if _PROC_POOL is pool:
+        _PROC_POOL = None
+    pool.shutdown(wait=False)
+
+def _mock_financial_data() -> Dict:
+    """Return a fresh copy of the mock data used when parsing yields nothing"""
+    print("   ⚠️ Using mock data for testing")
+    return _MOCK_DATA.copy()
+
+def _parse_financial_data(data_summary: str) -> Dict:
     """Parse financial data from text summary with bilingual support"""
     try:
         print("🔍 Parsing financial data...")
+        # 没有任何数字时无需逐个匹配
+        if not data_summary or not _DIGIT_RE.search(data_summary):
+            return _mock_financial_data()
         financial_data = {}
+        seen_keys = set()
         
-        # 双语支持的正则表达式模式
-        patterns = [
-            (r'(营业收入|Revenue)[：:\s]*([\d\.]+)', 'Revenue'),
-            (r'(净利润|Net Profit)[：:\s]*([\d\.]+)', 'Net Profit'),
-            (r'(毛利率|Gross Margin)[：:\s]*([\d\.]+)', 'Gross Margin'),
-            (r'(ROE|净资产收益率)[：:\s]*([\d\.]+)', 'ROE'),
-            (r'(资产负债率|Debt Ratio)[：:\s]*([\d\.]+)', 'Debt Ratio'),
-            (r'(总资产|Total Assets)[：:\s]*([\d\.]+)', 'Total Assets'),
-            (r'(总负债|Total Liabilities)[：:\s]*([\d\.]+)', 'Total Liabilities'),
-        ]
-        
-        for pattern, key in patterns:
-            match = re.search(pattern, data_summary, re.IGNORECASE)
-            if match:
-                try:
-                    value = float(match.group(2))
-                    financial_data[key] = value
-                    print(f"   ✅ Extracted {key}: {value}")
-                except (ValueError, IndexError) as e:
-                    print(f"   ❌ Failed to parse {key}: {e}")
-                    continue
+        for match in _FIN_MASTER_RE.finditer(data_summary):
+            key = _FIN_GROUP_KEYS[match.lastgroup]
+            if key in seen_keys:
+                # 与逐个搜索一致，每个指标只看第一次出现（即使该值解析失败）
+                continue
+            seen_keys.add(key)
+            try:
+                value = float(match.group(match.lastgroup))
+                financial_data[key] = value
+                print(f"   ✅ Extracted {key}: {value}")
+            except ValueError as e:
+                print(f"   ❌ Failed to parse {key}: {e}")
+                continue
+        # 保持指标的固定顺序（与文本出现顺序无关）
+        financial_data = {key: financial_data[key] for _, key in _FIN_FIELDS if key in financial_data}
         
         # 如果模式匹配失败，尝试更宽松的数字匹配
         if not financial_data:
             print("   🔍 Trying loose matching pattern...")
             # 匹配数字+单位模式
-            number_matches = re.findall(r'([\d\.]+)\s*(?:亿元|亿|%|percent|million|billion)', data_summary, re.IGNORECASE)
+            number_matches = _NUMBER_RE.findall(data_summary)
             
             # 预定义的指标名称
             predefined_keys = ['Revenue', 'Net Profit', 'Gross Margin', 'ROE', 'Other Metric 1', 'Other Metric 2']
@@ -303,15 +523,7 @@ async def _parse_financial_data(data_summary: str) -> Dict:
         
         # 如果还是没有数据，创建模拟数据用于测试
         if not financial_data:
-            print("   ⚠️ Using mock data for testing")
-            financial_data = {
-                'Revenue': 8900,
-                'Net Profit': 800, 
-                'Gross Margin': 45,
-                'ROE': 15,
-                'Total Assets': 15000,
-                'Total Liabilities': 7000
-            }
+            financial_data = _mock_financial_data()
         
         print(f"📋 Final parsed data: {financial_data}")
         return financial_data
@@ -319,75 +531,75 @@ async def _parse_financial_data(data_summary: str) -> Dict:
     except Exception as e:
         print(f"❌ Data parsing exception: {e}")
         # Return mock data to ensure test can continue
-        return {
-            'Revenue': 8900,
-            'Net Profit': 800,
-            'Gross Margin': 45,
-            'ROE': 15,
-            'Total Assets': 15000,
-            'Total Liabilities': 7000
-        }
+        return _mock_financial_data()
 
-async def _generate_specific_chart(parsed_data: Dict, chart_type: str, original_summary: str) -> Dict:
-    """Generate specific type of chart with proper data handling"""
-    try:
-        company = "Test Company"
-        year = "2023"
+def _plan_specific_chart(parsed_data: Dict, chart_type: str, original_summary: str) -> Tuple[str, Dict]:
+    """Choose chart kind and its generator arguments (all passed explicitly, as the cache key uses them)"""
+    company = "Test Company"
+    year = "2023"
+    
+    # Extract company info
+    company_match = _COMPANY_RE.search(original_summary)
+    year_match = _YEAR_RE.search(original_summary)
+    
+    if company_match and len(company_match.groups()) >= 2:
+        company = company_match.group(2)
+    if year_match:
+        year = year_match.group(1)
+    
+    chart_type_lower = chart_type.lower()
+    
+    if 'bar' in chart_type_lower or '柱' in chart_type_lower:
+        return 'bar', {
+            'data': parsed_data,
+            'title': f"{company} {year} Key Financial Indicators",
+            'style': 'corporate',
+        }
         
-        # Extract company info
-        company_match = re.search(r'(公司|Company)[：:\s]*([^\s，]+)', original_summary, re.IGNORECASE)
-        year_match = re.search(r'(\d{4})年', original_summary)
+    elif 'line' in chart_type_lower or '折线' in chart_type_lower:
+        # 创建模拟的季度数据用于折线图
+        if len(parsed_data) >= 4:
+            # 使用前4个指标创建季度数据
+            quarterly_data = {}
+            for i, (key, value) in enumerate(list(parsed_data.items())[:4]):
+                quarterly_data[f"Q{i+1} {key}"] = value
+        else:
+            # 如果数据不足，使用现有数据
+            quarterly_data = {f"Q{i+1}": list(parsed_data.values())[i] 
+                            for i in range(min(4, len(parsed_data)))}
         
-        if company_match and len(company_match.groups()) >= 2:
-            company = company_match.group(2)
-        if year_match:
-            year = year_match.group(1)
+        return 'line', {
+            'data': quarterly_data,
+            'title': f"{company} {year} Quarterly Performance",
+            'xlabel': 'Quarter',
+            'style': 'modern',
+        }
         
-        chart_type_lower = chart_type.lower()
+    elif 'pie' in chart_type_lower or '饼' in chart_type_lower:
+        return 'pie', {
+            'data': parsed_data,
+            'title': f"{company} {year} Financial Structure",
+            'style': 'classic',
+        }
         
-        if 'bar' in chart_type_lower or '柱' in chart_type_lower:
-            return chart_generator.generate_bar_chart(
-                parsed_data, 
-                f"{company} {year} Key Financial Indicators", 
-                'corporate'
-            )
-            
-        elif 'line' in chart_type_lower or '折线' in chart_type_lower:
-            # 创建模拟的季度数据用于折线图
-            if len(parsed_data) >= 4:
-                # 使用前4个指标创建季度数据
-                quarterly_data = {}
-                for i, (key, value) in enumerate(list(parsed_data.items())[:4]):
-                    quarterly_data[f"Q{i+1} {key}"] = value
-            else:
-                # 如果数据不足，使用现有数据
-                quarterly_data = {f"Q{i+1}": list(parsed_data.values())[i] 
-                                for i in range(min(4, len(parsed_data)))}
-            
-            return chart_generator.generate_line_chart(
-                quarterly_data,
-                f"{company} {year} Quarterly Performance",
-                'Quarter',
-                'modern'
-            )
-            
-        elif 'pie' in chart_type_lower or '饼' in chart_type_lower:
-            return chart_generator.generate_pie_chart(
-                parsed_data,
-                f"{company} {year} Financial Structure",
-                'classic'
-            )
-            
-        elif 'dashboard' in chart_type_lower or '仪表' in chart_type_lower:
-            return chart_generator.generate_metrics_dashboard(parsed_data, company, year)
-            
-        else:
-            # Default to bar chart
-            return chart_generator.generate_bar_chart(
-                parsed_data,
-                f"{company} {year} Financial Metrics",
-                'corporate'
-            )
+    elif 'dashboard' in chart_type_lower or '仪表' in chart_type_lower:
+        return 'dashboard', {'metrics': parsed_data, 'company': company, 'year': year}
+        
+    else:
+        # Default to bar chart
+        return 'bar', {
+            'data': parsed_data,
+            'title': f"{company} {year} Financial Metrics",
+            'style': 'corporate',
+        }
+
+def _generate_specific_chart(parsed_data: Dict, chart_type: str, original_summary: str,
+                             return_base64: bool = False) -> Dict:
+    """Generate specific type of chart with proper data handling"""
+    try:
+        kind, chart_kwargs = _plan_specific_chart(parsed_data, chart_type, original_summary)
+        generate = getattr(chart_generator, _CHART_METHODS[kind])
+        return generate(**chart_kwargs, return_base64=return_base64)
             
     except Exception as e:
         logger.error(f"Specific chart generation failed: {e}")
@@ -400,13 +612,31 @@ async def generate_chart(data_summary: str, chart_type: str) -> str:
     
     try:
         # Parse data summary, extract structured data
-        parsed_data = await _parse_financial_data(data_summary)
+        parsed_data = _parse_financial_data(data_summary)
         
         if not parsed_data or len(parsed_data) < 2:
             return "❌ Cannot extract sufficient financial information from provided data for chart generation."
         
-        # Call different generation methods based on chart type
-        chart_result = await _generate_specific_chart(parsed_data, chart_type, data_summary)
+        # Choose chart type; reuse a cached chart or render it in a worker process
+        # Response only reports the file path, so base64 is never encoded here
+        kind, chart_kwargs = _plan_specific_chart(parsed_data, chart_type, data_summary)
+        cache_key = chart_generator._cache_key(kind, **chart_kwargs)
+        chart_result = chart_generator._cache_get(cache_key)
+        if chart_result is None:
+            loop = asyncio.get_running_loop()
+            pool = None
+            try:
+                pool = _get_process_pool()
+                chart_result = await loop.run_in_executor(
+                    pool, _render_chart_worker, kind, chart_kwargs
+                )
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Chart worker pool unavailable, rendering in-process: {e}")
+                if pool is not None:
+                    _discard_process_pool(pool)
+                chart_result = _render_chart_worker(kind, chart_kwargs)
+            if chart_result["status"] == "success":
+                chart_generator._cache_put(cache_key, chart_result)
         
         if chart_result["status"] == "success":
             response = f"""
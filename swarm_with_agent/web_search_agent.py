@@ -1,15 +1,49 @@
 # baidu_search_agent.py - 优化版
 import requests
+from requests.adapters import HTTPAdapter
+import httpx
 from bs4 import BeautifulSoup
+import soupsieve
+import importlib.util
 import urllib.parse
 import asyncio
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
 import re
 import time
 
 logger = logging.getLogger(__name__)
 
+# 优先使用C实现的lxml解析器，未安装时退回纯Python的html.parser
+_HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+# 预编译的正则表达式
+_TITLE_CLASS_RE = re.compile(r'title|head')
+# 常见噪音，合并为单个交替模式，一次扫描完成替换
+_NOISE_RE = re.compile('|'.join([
+    r'百度快照.*',
+    r'相关视频.*',
+    r'广告',
+    r'推广',
+    r'查看更多',
+    r'\.\.\.',
+]))
+# 广告标识，一次扫描匹配全部关键词（"ad"按整词匹配，避免误伤head/read等）
+_AD_RE = re.compile(r'广告|推广|advertisement|\bad\b', re.IGNORECASE)
+_AD_TITLE_RE = re.compile(r'广告|推广')
+# 结果容器选择器，按优先级排列
+_RESULT_SELECTORS = [
+    'div.result',
+    'div.c-container',
+    'div[class*="result"]',
+    'div[class*="c-container"]',
+    'div.content-left',
+    'div[srcid]',
+]
+# 合并为复合选择器只遍历一次DOM，再按优先级逐个匹配
+_RESULT_SELECTOR = ', '.join(_RESULT_SELECTORS)
+_RESULT_MATCHERS = [(sel, soupsieve.compile(sel)) for sel in _RESULT_SELECTORS]
+
 class BaiduSearchAgent:
     """使用百度搜索引擎的代理"""
     
@@ -25,27 +59,109 @@ class BaiduSearchAgent:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # 异步搜索共享的客户端（HTTP/2多路复用），首次使用时创建
+        self._client: Optional[httpx.AsyncClient] = None
+        # 搜索结果缓存（LRU + TTL），键为规范化后的查询
+        self._result_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._result_cache_maxsize = 256
+        self._result_cache_ttl = 300  # 秒
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取（必要时创建）共享的httpx异步客户端"""
+        if self._client is None or self._client.is_closed:
+            # HTTP/2禁止Connection等逐跳头部
+            headers = {k: v for k, v in self.headers.items() if k != "Connection"}
+            limits = httpx.Limits(max_keepalive_connections=16)
+            try:
+                self._client = httpx.AsyncClient(http2=True, headers=headers,
+                                                 timeout=15.0, limits=limits)
+            except ImportError:
+                # 未安装h2时退回HTTP/1.1
+                logger.warning("未安装h2，使用HTTP/1.1")
+                self._client = httpx.AsyncClient(headers=headers, timeout=15.0, limits=limits)
+        return self._client
+    
+    async def aclose(self):
+        """关闭共享的httpx客户端"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    def _build_params(self, query: str, num_results: int) -> Dict:
+        """构造查询参数"""
+        return {
+            "wd": query,
+            "rn": num_results,  # 结果数量
+            "ie": "utf-8",
+            "cl": 3,  # 网页类型
+        }
+    
+    def _parse_html(self, html: str) -> List[Dict]:
+        """解析百度结果页HTML"""
+        soup = BeautifulSoup(html, _HTML_PARSER)
+        return self._parse_baidu_results_optimized(soup)
+    
+    def _cache_lookup(self, key: Tuple[str, int]) -> Optional[List[Dict]]:
+        """查询未过期的缓存结果"""
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, results = entry
+        if time.monotonic() - stored_at > self._result_cache_ttl:
+            del self._result_cache[key]
+            return None
+        self._result_cache.move_to_end(key)
+        # 返回副本，调用方修改结果不会影响缓存
+        return [dict(r) for r in results]
+    
+    def _cache_store(self, key: Tuple[str, int], results: List[Dict]) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        self._result_cache[key] = (time.monotonic(), [dict(r) for r in results])
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self._result_cache_maxsize:
+            self._result_cache.popitem(last=False)
+    
+    async def search_baidu_async(self, query: str, num_results: int = 8) -> List[Dict]:
+        """使用百度搜索并解析结果（原生协程，短时缓存重复查询）"""
+        query = query.strip()
+        cache_key = (query.lower(), num_results)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            logger.info(f"命中搜索缓存: {query}")
+            return cached
+        
+        try:
+            params = self._build_params(query, num_results)
+            
+            logger.info(f"搜索百度: {query}")
+            response = await self._get_client().get(self.base_url, params=params)
+            response.raise_for_status()
+            
+            # HTML解析是CPU密集操作，放到线程中执行，避免阻塞共享的事件循环
+            results = await asyncio.to_thread(self._parse_html, response.text)
+            # 只缓存非空结果；空列表多为反爬页面，重试时需重新请求
+            if results:
+                self._cache_store(cache_key, results)
+            return results
+            
+        except Exception as e:
+            logger.error(f"百度搜索失败: {e}")
+            # 返回模拟数据作为备用
+            return self._get_fallback_results(query)
     
     def search_baidu(self, query: str, num_results: int = 8) -> List[Dict]:
-        """使用百度搜索并解析结果"""
+        """使用百度搜索并解析结果（同步版本，保留以兼容旧调用）"""
         try:
-            # 编码查询参数
-            params = {
-                "wd": query,
-                "rn": num_results,  # 结果数量
-                "ie": "utf-8",
-                "cl": 3,  # 网页类型
-            }
+            params = self._build_params(query, num_results)
             
             logger.info(f"搜索百度: {query}")
             response = self.session.get(self.base_url, params=params, timeout=15)
             response.raise_for_status()
             
-            # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            results = self._parse_baidu_results_optimized(soup)
-            
-            return results
+            return self._parse_html(response.text)
             
         except Exception as e:
             logger.error(f"百度搜索失败: {e}")
@@ -56,18 +172,10 @@ class BaiduSearchAgent:
         """百度结果解析"""
         results = []
         
-        # 尝试多种可能的选择器
-        selectors = [
-            'div.result',
-            'div.c-container',
-            'div[class*="result"]',
-            'div[class*="c-container"]',
-            'div.content-left',
-            'div[srcid]'
-        ]
-        
-        for selector in selectors:
-            result_containers = soup.select(selector)
+        # 复合选择器一次取出所有候选，再使用第一个有命中的选择器（与逐个select等价）
+        candidates = soup.select(_RESULT_SELECTOR)
+        for selector, matcher in _RESULT_MATCHERS:
+            result_containers = [el for el in candidates if matcher.match(el)]
             if result_containers:
                 logger.info(f"使用选择器 '{selector}' 找到 {len(result_containers)} 个结果")
                 for container in result_containers[:10]:
@@ -97,7 +205,7 @@ class BaiduSearchAgent:
         """解析单个搜索结果"""
         # 提取标题
         title_elem = (container.find('h3') or 
-                     container.find('a', class_=re.compile(r'title|head')) or
+                     container.find('a', class_=_TITLE_CLASS_RE) or
                      container.find('a'))
         
         if not title_elem:
@@ -178,7 +286,7 @@ class BaiduSearchAgent:
                     continue
                 
                 # 简单过滤广告
-                if any(word in title.lower() for word in ['广告', '推广']):
+                if _AD_TITLE_RE.search(title):
                     continue
                 
                 # 提取容器内的文本作为摘要
@@ -200,9 +308,7 @@ class BaiduSearchAgent:
     
     def _is_ad(self, container) -> bool:
         """判断是否为广告"""
-        ad_indicators = ['广告', '推广', 'ad', 'advertisement']
-        container_text = container.get_text().lower()
-        return any(indicator in container_text for indicator in ad_indicators)
+        return bool(_AD_RE.search(container.get_text()))
     
     def _clean_abstract(self, abstract: str) -> str:
         """清理摘要文本"""
@@ -214,17 +320,7 @@ class BaiduSearchAgent:
             return ""
         
         # 移除常见噪音
-        noise_patterns = [
-            r'百度快照.*',
-            r'相关视频.*',
-            r'广告',
-            r'推广',
-            r'查看更多',
-            r'\.\.\.',
-        ]
-        
-        for pattern in noise_patterns:
-            abstract = re.sub(pattern, '', abstract)
+        abstract = _NOISE_RE.sub('', abstract)
         
         # 限制长度
         if len(abstract) > 200:
@@ -236,9 +332,8 @@ class BaiduSearchAgent:
         """清理文本"""
         if not text:
             return ""
-        # 替换多个空白字符为单个空格
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        # 替换多个空白字符为单个空格（str.split无参数时按全部Unicode空白切分，含全角空格）
+        return ' '.join(text.split())
     
     def _get_fallback_results(self, query: str) -> List[Dict]:
         """获取备用结果（当搜索失败时使用）"""
@@ -278,8 +373,7 @@ class BaiduSearchAgent:
     
     async def async_search(self, query: str) -> str:
         """异步搜索接口"""
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, self.search_baidu, query)
+        results = await self.search_baidu_async(query)
         return self.format_search_results(results, query)
 
 # 创建全局实例
@@ -290,6 +384,11 @@ async def search_market_info(query: str) -> str:
     """适配原有系统的搜索函数"""
     return await baidu_agent.async_search(query)
 
+# 程序退出时调用，关闭共享的HTTP客户端
+async def close_search_agent():
+    """关闭搜索代理持有的连接"""
+    await baidu_agent.aclose()
+
 # 专门用于财务搜索的函数
 async def search_financial_info(company: str, year: str = "") -> str:
     """搜索公司财务信息"""